@@ -18,7 +18,7 @@ import torch
 import termcolor
 
 from gpt_oss.tools import apply_patch
-from gpt_oss.tools.simple_browser import SimpleBrowserTool
+from gpt_oss.tools.simple_browser import SimpleBrowserTool, close_shared_session
 from gpt_oss.tools.simple_browser.backend import YouComBackend
 from gpt_oss.tools.python_docker.docker_tool import PythonTool
 
@@ -148,6 +148,13 @@ def main(args):
             print(termcolor.colored("Developer Message:", "yellow"), flush=True)
             print(developer_message_content.instructions, flush=True)
 
+    # Run every tool call on one event loop so that the browser's pooled HTTP
+    # session, which is bound to its loop, is reused and closed cleanly.
+    runner = asyncio.Runner()
+    atexit.register(runner.close)
+    if args.browser:
+        atexit.register(lambda: runner.run(close_shared_session()))
+
     # Print the system message and the user message start
     MESSAGE_PADDING = 12
     while True:
@@ -173,7 +180,7 @@ def main(args):
                         results.append(msg)
                     return results
 
-                result = asyncio.run(run_tool())
+                result = runner.run(run_tool())
                 messages += result
             elif last_message.recipient.startswith("python"):
                 assert args.python, "Python tool is not enabled"
@@ -184,7 +191,7 @@ def main(args):
                         results.append(msg)
                     return results
 
-                result = asyncio.run(run_tool())
+                result = runner.run(run_tool())
                 messages += result
             elif last_message.recipient == "functions.apply_patch":
                 assert args.apply_patch, "Apply patch tool is not enabled"
@@ -185,6 +185,26 @@ enum gptoss_status GPTOSS_ABI gptoss_context_create(
     size_t context_length,
     gptoss_context_t* context_out);
 
+/*
+ * Creates a Context object with an INT8-quantized KV cache for use with the particular Model object.
+ *
+ * K and V vectors are stored as 8-bit integers with one FP16 scale per attention head vector, which reduces
+ * KV cache memory and bandwidth about 4x compared to the FP32 KV cache of gptoss_context_create.
+ *
+ * @param model Model object to create a context for.
+ * @param context_length Maximum number of tokens in the context.
+ *                       Specify 0 to use the maximum context length supported by the model.
+ * @param context_out Pointer to the Context object that will be created.
+ *                    Must be released with gptoss_release_context.
+ *
+ * On success, returns gptoss_status_success and saves a pointer to the created Context in the context_out argument.
+ * On failure, returns an error code and stores null pointer in the context_out argument.
+ */
+enum gptoss_status GPTOSS_ABI gptoss_context_create_quantized(
+    gptoss_model_t model,
+    size_t context_length,
+    gptoss_context_t* context_out);
+
 /*
  * Query the current number of tokens cached in the Context.
  *
@@ -286,9 +306,12 @@ enum gptoss_status GPTOSS_ABI gptoss_context_process(
  * @param context Context object created by gptoss_context_create.
  * @param temperature Sampling temperature. Must be non-negative.
  * @param seed Random number generator seed to use for sampling.
- * @param token_out Pointer to the variable where the token ID will be stored.
+ * @param max_tokens Maximum number of tokens to generate. Generation stops early when the Context is full.
+ * @param tokens_out Pointer to the array where up to max_tokens generated token IDs will be stored.
+ * @param num_tokens_out Pointer to the variable where the number of generated tokens will be stored.
  *
  * On success, returns gptoss_status_success, otherwise returns an error code.
+ * Returns gptoss_status_context_overflow if the Context is already full.
  */
 enum gptoss_status GPTOSS_ABI gptoss_context_sample(
     gptoss_context_t context,
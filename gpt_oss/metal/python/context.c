@@ -6,12 +6,13 @@
 
 
 static int PyGPTOSSContext_init(PyGPTOSSContext* self, PyObject* args, PyObject* kwargs) {
-    static char *kwlist[] = {"model", "context_length", NULL};
+    static char *kwlist[] = {"model", "context_length", "quantize_kv", NULL};
     PyObject* model = NULL;
     Py_ssize_t context_length = 0; // Default to 0 if None
+    int quantize_kv = 0;
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|$i", kwlist,
-                                     &model, &context_length)) {
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|$ip", kwlist,
+                                     &model, &context_length, &quantize_kv)) {
         return -1;
     }
     if (!PyObject_TypeCheck(model, &PyGPTOSSModel_Type)) {
@@ -23,7 +24,7 @@ static int PyGPTOSSContext_init(PyGPTOSSContext* self, PyObject* args, PyObject*
         return -1;
     }
 
-    enum gptoss_status status = gptoss_context_create(
+    enum gptoss_status status = (quantize_kv ? gptoss_context_create_quantized : gptoss_context_create)(
         ((const PyGPTOSSModel*) model)->handle,
         (size_t) context_length,
         &self->handle);
@@ -109,6 +110,85 @@ static PyObject* PyGPTOSSContext_append(PyGPTOSSContext* self, PyObject* arg) {
     }
 }
 
+static void set_append_tokens_error(enum gptoss_status status) {
+    switch (status) {
+        case gptoss_status_invalid_argument:
+            PyErr_SetString(PyExc_ValueError, "token is out of range for the model vocabulary");
+            break;
+        case gptoss_status_context_overflow:
+            PyErr_SetString(PyExc_RuntimeError, "appending tokens would overflow the context");
+            break;
+        default:
+            PyErr_Format(PyExc_RuntimeError, "failed to append tokens (status %d)", (int) status);
+            break;
+    }
+}
+
+static PyObject* PyGPTOSSContext_append_tokens(PyGPTOSSContext* self, PyObject* arg) {
+    if (PyObject_CheckBuffer(arg)) {
+        Py_buffer view;
+        if (PyObject_GetBuffer(arg, &view, PyBUF_FORMAT | PyBUF_C_CONTIGUOUS) < 0) {
+            return NULL;
+        }
+        if (view.itemsize != sizeof(uint32_t) || view.format == NULL ||
+            (strcmp(view.format, "I") != 0 && strcmp(view.format, "i") != 0 &&
+             strcmp(view.format, "=I") != 0 && strcmp(view.format, "=i") != 0 &&
+             strcmp(view.format, "<I") != 0 && strcmp(view.format, "<i") != 0))
+        {
+            PyBuffer_Release(&view);
+            PyErr_SetString(PyExc_TypeError, "expected a buffer of 32-bit integers");
+            return NULL;
+        }
+
+        const enum gptoss_status status = gptoss_context_append_tokens(
+            self->handle, (size_t) (view.len / view.itemsize), (const uint32_t*) view.buf);
+        PyBuffer_Release(&view);
+        if (status != gptoss_status_success) {
+            set_append_tokens_error(status);
+            return NULL;
+        }
+
+        Py_RETURN_NONE;
+    }
+
+    PyObject* token_seq_obj = PySequence_Fast(arg, "expected a buffer or sequence of integer tokens");
+    if (token_seq_obj == NULL) {
+        return NULL;
+    }
+
+    const Py_ssize_t num_tokens = PySequence_Fast_GET_SIZE(token_seq_obj);
+    uint32_t* token_ptr = (uint32_t*) PyMem_Malloc(num_tokens * sizeof(uint32_t));
+    if (token_ptr == NULL) {
+        PyErr_NoMemory();
+        goto error;
+    }
+
+    PyObject** token_items = PySequence_Fast_ITEMS(token_seq_obj);
+    for (Py_ssize_t t = 0; t < num_tokens; t++) {
+        const unsigned long token_as_ulong = PyLong_AsUnsignedLong(token_items[t]);
+        if (token_as_ulong == (unsigned long) -1 && PyErr_Occurred()) {
+            goto error;
+        }
+        token_ptr[t] = (uint32_t) token_as_ulong;
+    }
+
+    const enum gptoss_status status = gptoss_context_append_tokens(
+        self->handle, (size_t) num_tokens, token_ptr);
+    if (status != gptoss_status_success) {
+        set_append_tokens_error(status);
+        goto error;
+    }
+
+    PyMem_Free(token_ptr);
+    Py_DECREF(token_seq_obj);
+    Py_RETURN_NONE;
+
+error:
+    PyMem_Free(token_ptr);
+    Py_DECREF(token_seq_obj);
+    return NULL;
+}
+
 static PyObject* PyGPTOSSContext_process(PyGPTOSSContext* self) {
     const enum gptoss_status status = gptoss_context_process(self->handle);
     if (status != gptoss_status_success) {
@@ -143,7 +223,11 @@ static PyObject* PyGPTOSSContext_sample(PyGPTOSSContext* self, PyObject* args, P
         self->handle, temperature, (uint64_t) seed,
         (size_t) max_output_tokens, token_ptr, &num_tokens);
     if (status != gptoss_status_success) {
-        // TODO: set exception
+        if (status == gptoss_status_context_overflow) {
+            PyErr_SetString(PyExc_RuntimeError, "context is full; no room to sample more tokens");
+        } else {
+            PyErr_Format(PyExc_RuntimeError, "failed to sample tokens (status %d)", (int) status);
+        }
         goto error;
     }
 
@@ -183,6 +267,7 @@ static PyObject* PyGPTOSSContext_reset(PyGPTOSSContext* self) {
 static PyMethodDef PyGPTOSSContext_methods[] = {
     {"__copy__", (PyCFunction) PyGPTOSSContext_copy, METH_NOARGS, "Create a copy of the Context"},
     {"append", (PyCFunction) PyGPTOSSContext_append, METH_O, "Append bytes to the Context"},
+    {"append_tokens", (PyCFunction) PyGPTOSSContext_append_tokens, METH_O, "Append a buffer or sequence of tokens to the Context"},
     {"process", (PyCFunction) PyGPTOSSContext_process, METH_NOARGS, "Process tokens in the Context"},
     {"sample", (PyCFunction) PyGPTOSSContext_sample, METH_VARARGS | METH_KEYWORDS, "Sample token predictions from the Context"},
     {"reset", (PyCFunction) PyGPTOSSContext_reset, METH_NOARGS, "Discard the content of the Context"},
@@ -6,6 +6,10 @@
 #include <stdlib.h>
 #include <string.h>
 
+#include <errno.h>  // errno
+#include <mach/vm_page_size.h>  // vm_page_size
+#include <sys/mman.h>  // mmap, madvise, munmap
+
 #include <gpt-oss.h>
 
 #include "internal/datatype.h"
@@ -13,12 +17,14 @@
 #include "internal/metal.h"
 #include "internal/metal-kernels.h"
 #include "internal/log.h"
+#include "internal/math.h"
 #include "internal/rng.h"
 
 
-enum gptoss_status GPTOSS_ABI gptoss_context_create(
+static enum gptoss_status context_create(
     gptoss_model_t model,
     size_t context_length,
+    bool quantize_kvcache,
     gptoss_context_t* context_out)
 {
     *context_out = NULL;
@@ -106,17 +112,45 @@ enum gptoss_status GPTOSS_ABI gptoss_context_create(
     if (status != gptoss_status_success) {
         goto cleanup;
     }
-    status = gptoss_metal_buffer_create(&model->device, model->num_blocks * context_length * 2 * model->num_kv_heads * model->head_dim * sizeof(float), NULL, &context->kvcache_buffer);
+
+    // KV cache: back with a page-aligned anonymous mapping wrapped without copy, so that the pages are shared with
+    // the GPU. Pages are still faulted in on first use: prefaulting the whole cache would commit memory for the full
+    // context length even for short conversations.
+    const size_t kvcache_element_size = quantize_kvcache ? sizeof(int8_t) : sizeof(float);
+    const size_t kvcache_size = model->num_blocks * context_length * 2 * model->num_kv_heads * model->head_dim * kvcache_element_size;
+    const size_t kvcache_mapping_size = math_round_up_po2(kvcache_size, (size_t) vm_page_size);
+    void* kvcache_mapping_ptr = mmap(NULL, kvcache_mapping_size, PROT_READ | PROT_WRITE, MAP_SHARED | MAP_ANON, -1, 0);
+    if (kvcache_mapping_ptr == MAP_FAILED) {
+        GPTOSS_LOG_ERROR("failed to mmap KV cache of size %zu", kvcache_mapping_size);
+        status = gptoss_status_insufficient_memory;
+        goto cleanup;
+    }
+    context->kvcache_mapping_ptr = kvcache_mapping_ptr;
+    context->kvcache_mapping_size = kvcache_mapping_size;
+
+    // Only a hint: on Darwin, MADV_WILLNEED does not fault in pages of a fresh anonymous mapping.
+    if (madvise(kvcache_mapping_ptr, kvcache_mapping_size, MADV_WILLNEED) != 0) {
+        GPTOSS_LOG_WARNING("madvise(KV cache, size=%zu) failed with error %d", kvcache_mapping_size, errno);
+    }
+
+    status = gptoss_metal_buffer_wrap(&model->device, kvcache_mapping_size, kvcache_mapping_ptr, &context->kvcache_buffer);
     if (status != gptoss_status_success) {
         goto cleanup;
     }
+    if (quantize_kvcache) {
+        status = gptoss_metal_buffer_create(&model->device, model->num_blocks * context_length * 2 * model->num_kv_heads * sizeof(gptoss_float16), NULL, &context->kvscale_buffer);
+        if (status != gptoss_status_success) {
+            goto cleanup;
+        }
+    }
+    context->quantize_kvcache = quantize_kvcache;
 
-    context->kvcache_size = context->kvcache_buffer.size;
+    context->kvcache_size = context->kvcache_buffer.size + context->kvscale_buffer.size;
     context->allocation_size = 
         context->residual_activation_buffer.size + context->rmsnorm_activation_buffer.size +
         context->qkv_activation_buffer.size + context->sdpa_activation_buffer.size +
         context->gate_activation_buffer.size + context->expert_activation_buffer.size + context->swiglu_activation_buffer.size + context->moe_activation_buffer.size +
-        context->token_buffer.size + context->kvcache_buffer.size + context->score_buffer.size + context->argmax_buffer.size;
+        context->token_buffer.size + context->kvcache_buffer.size + context->kvscale_buffer.size + context->score_buffer.size + context->argmax_buffer.size;
 
     context->model = model;
     gptoss_model_retain(model);
@@ -128,6 +162,22 @@ cleanup:
     return status;
 }
 
+enum gptoss_status GPTOSS_ABI gptoss_context_create(
+    gptoss_model_t model,
+    size_t context_length,
+    gptoss_context_t* context_out)
+{
+    return context_create(model, context_length, /*quantize_kvcache=*/false, context_out);
+}
+
+enum gptoss_status GPTOSS_ABI gptoss_context_create_quantized(
+    gptoss_model_t model,
+    size_t context_length,
+    gptoss_context_t* context_out)
+{
+    return context_create(model, context_length, /*quantize_kvcache=*/true, context_out);
+}
+
 enum gptoss_status GPTOSS_ABI gptoss_context_get_num_tokens(
     gptoss_context_t context,
     size_t* num_tokens_out)
@@ -276,40 +326,86 @@ static enum gptoss_status process_tokens(
                 return status;
             }
 
-            for (uint32_t t = 0; t < input_batch_size; t++) {
-                status = gptoss_metal_command_buffer_encode_copy_buffer(
+            if (context->quantize_kvcache) {
+                status = gptoss_metal_command_buffer_encode_launch_f32_i8kv_store(
                     command_buffer,
+                    &model->f32_i8kv_store_fn,
                     &context->qkv_activation_buffer,
-                    /*input_offset=*/(t * attn_qkv_dim + model->num_heads * model->head_dim) * sizeof(float),
+                    /*input_offset=*/model->num_heads * model->head_dim * sizeof(float),
                     &context->kvcache_buffer,
-                    /*output_offset=*/(n * context->max_tokens + input_batch_start + t) * 2 * model->num_kv_heads * model->head_dim * sizeof(float),
-                    /*size=*/2 * model->num_kv_heads * model->head_dim * sizeof(float));
+                    /*kvcache_offset=*/(n * context->max_tokens + input_batch_start) * 2 * model->num_kv_heads * model->head_dim * sizeof(int8_t),
+                    &context->kvscale_buffer,
+                    /*kvscale_offset=*/(n * context->max_tokens + input_batch_start) * 2 * model->num_kv_heads * sizeof(gptoss_float16),
+                    &context->control_buffer,
+                    /*control_offset=*/0,
+                    input_batch_size,
+                    model->num_heads, model->num_kv_heads, model->head_dim);
                 if (status != gptoss_status_success) {
-                    GPTOSS_LOG_ERROR("failed to encode copy of token %" PRIu32 " to KV cache", t);
+                    GPTOSS_LOG_ERROR("failed to encode f32_i8kv_store kernel launch");
                     return status;
                 }
+            } else {
+                for (uint32_t t = 0; t < input_batch_size; t++) {
+                    status = gptoss_metal_command_buffer_encode_copy_buffer(
+                        command_buffer,
+                        &context->qkv_activation_buffer,
+                        /*input_offset=*/(t * attn_qkv_dim + model->num_heads * model->head_dim) * sizeof(float),
+                        &context->kvcache_buffer,
+                        /*output_offset=*/(n * context->max_tokens + input_batch_start + t) * 2 * model->num_kv_heads * model->head_dim * sizeof(float),
+                        /*size=*/2 * model->num_kv_heads * model->head_dim * sizeof(float));
+                    if (status != gptoss_status_success) {
+                        GPTOSS_LOG_ERROR("failed to encode copy of token %" PRIu32 " to KV cache", t);
+                        return status;
+                    }
+                }
             }
 
             if (num_block_output_tokens != 0) {
-                status = gptoss_metal_command_buffer_encode_launch_f32_sdpa(
-                    command_buffer,
-                    &model->f32_sdpa_q8_d64_fn,
-                    &context->qkv_activation_buffer,
-                    /*q_offset=*/attn_qkv_dim * (input_batch_size - num_block_output_tokens) * sizeof(float),
-                    &context->kvcache_buffer,
-                    /*k_offset=*/n * context->max_tokens * 2 * model->num_kv_heads * model->head_dim * sizeof(float),
-                    &context->kvcache_buffer,
-                    /*v_offset=*/(n * context->max_tokens * 2 + 1) * model->num_kv_heads * model->head_dim * sizeof(float),
-                    &model->shared_weight_buffer,
-                    /*s_offset=*/model->attn_sdpa_sink_offset + model->per_block_shared_weights_size * n,
-                    &context->sdpa_activation_buffer,
-                    /*output_offset=*/0,
-                    &context->control_buffer,
-                    /*control_offset=*/0,
-                    /*window=*/n % 2 == 0 ? model->attention_window : UINT32_MAX,
-                    num_block_output_tokens,
-                    input_batch_start + input_batch_size - num_block_output_tokens,
-                    model->num_heads, model->num_kv_heads, model->head_dim);
+                if (context->quantize_kvcache) {
+                    status = gptoss_metal_command_buffer_encode_launch_f32_i8kv_sdpa(
+                        command_buffer,
+                        &model->f32_i8kv_sdpa_q8_d64_fn,
+                        &context->qkv_activation_buffer,
+                        /*q_offset=*/attn_qkv_dim * (input_batch_size - num_block_output_tokens) * sizeof(float),
+                        &context->kvcache_buffer,
+                        /*k_offset=*/n * context->max_tokens * 2 * model->num_kv_heads * model->head_dim * sizeof(int8_t),
+                        &context->kvcache_buffer,
+                        /*v_offset=*/(n * context->max_tokens * 2 + 1) * model->num_kv_heads * model->head_dim * sizeof(int8_t),
+                        &context->kvscale_buffer,
+                        /*k_scale_offset=*/n * context->max_tokens * 2 * model->num_kv_heads * sizeof(gptoss_float16),
+                        &context->kvscale_buffer,
+                        /*v_scale_offset=*/(n * context->max_tokens * 2 + 1) * model->num_kv_heads * sizeof(gptoss_float16),
+                        &model->shared_weight_buffer,
+                        /*s_offset=*/model->attn_sdpa_sink_offset + model->per_block_shared_weights_size * n,
+                        &context->sdpa_activation_buffer,
+                        /*output_offset=*/0,
+                        &context->control_buffer,
+                        /*control_offset=*/0,
+                        /*window=*/n % 2 == 0 ? model->attention_window : UINT32_MAX,
+                        num_block_output_tokens,
+                        input_batch_start + input_batch_size - num_block_output_tokens,
+                        model->num_heads, model->num_kv_heads, model->head_dim);
+                } else {
+                    status = gptoss_metal_command_buffer_encode_launch_f32_sdpa(
+                        command_buffer,
+                        &model->f32_sdpa_q8_d64_fn,
+                        &context->qkv_activation_buffer,
+                        /*q_offset=*/attn_qkv_dim * (input_batch_size - num_block_output_tokens) * sizeof(float),
+                        &context->kvcache_buffer,
+                        /*k_offset=*/n * context->max_tokens * 2 * model->num_kv_heads * model->head_dim * sizeof(float),
+                        &context->kvcache_buffer,
+                        /*v_offset=*/(n * context->max_tokens * 2 + 1) * model->num_kv_heads * model->head_dim * sizeof(float),
+                        &model->shared_weight_buffer,
+                        /*s_offset=*/model->attn_sdpa_sink_offset + model->per_block_shared_weights_size * n,
+                        &context->sdpa_activation_buffer,
+                        /*output_offset=*/0,
+                        &context->control_buffer,
+                        /*control_offset=*/0,
+                        /*window=*/n % 2 == 0 ? model->attention_window : UINT32_MAX,
+                        num_block_output_tokens,
+                        input_batch_start + input_batch_size - num_block_output_tokens,
+                        model->num_heads, model->num_kv_heads, model->head_dim);
+                }
                 if (status != gptoss_status_success) {
                     GPTOSS_LOG_ERROR("failed to encode f32_sdpa kernel launch");
                     return status;
@@ -721,6 +817,13 @@ enum gptoss_status GPTOSS_ABI gptoss_context_sample(
 
     *num_tokens_out = 0;
 
+    // Every sampled token is written to the token buffer and the KV cache, so never sample past the context length.
+    const size_t num_available_tokens = context->max_tokens - context->num_tokens;
+    if (num_available_tokens == 0) {
+        return gptoss_status_context_overflow;
+    }
+    max_tokens = math_min(max_tokens, num_available_tokens);
+
     const uint32_t num_original_tokens = context->num_tokens;
 
     status = gptoss_metal_command_buffer_create(&context->model->command_queue, &command_buffer);
@@ -873,6 +976,12 @@ enum gptoss_status GPTOSS_ABI gptoss_context_release(
             gptoss_metal_buffer_release(&context->sum_buffer);
             gptoss_metal_buffer_release(&context->argmax_buffer);
             gptoss_metal_buffer_release(&context->kvcache_buffer);
+            gptoss_metal_buffer_release(&context->kvscale_buffer);
+            if (context->kvcache_mapping_ptr != NULL && context->kvcache_mapping_size != 0) {
+                if (munmap(context->kvcache_mapping_ptr, context->kvcache_mapping_size) != 0) {
+                    GPTOSS_LOG_WARNING("munmap for KV cache mapping failed with error %d", errno);
+                }
+            }
 
             gptoss_model_release(context->model);
 
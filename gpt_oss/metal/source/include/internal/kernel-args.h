@@ -23,6 +23,12 @@ struct gptoss_sdpa_args {
     uint32_t window;
 };
 
+struct gptoss_i8kv_store_args {
+    uint32_t input_token_stride;
+    uint32_t output_token_stride;
+    uint32_t scale_token_stride;
+};
+
 struct gptoss_u32_fill_random_args {
     uint64_t num_vecs_per_threadgroup;
     uint64_t num_vecs;
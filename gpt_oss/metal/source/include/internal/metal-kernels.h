@@ -269,6 +269,48 @@ enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_sdpa(
     uint32_t num_kv_heads,
     uint32_t head_dim);
 
+enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_i8kv_sdpa(
+    const struct gptoss_metal_command_buffer* command_buffer,
+    const struct gptoss_metal_function* f32_i8kv_sdpa_fn,
+    const struct gptoss_metal_buffer* q_buffer,
+    size_t q_offset,
+    const struct gptoss_metal_buffer* k_buffer,
+    size_t k_offset,
+    const struct gptoss_metal_buffer* v_buffer,
+    size_t v_offset,
+    const struct gptoss_metal_buffer* k_scale_buffer,
+    size_t k_scale_offset,
+    const struct gptoss_metal_buffer* v_scale_buffer,
+    size_t v_scale_offset,
+    const struct gptoss_metal_buffer* s_buffer,
+    size_t s_offset,
+    const struct gptoss_metal_buffer* output_buffer,
+    size_t output_offset,
+    const struct gptoss_metal_buffer* control_buffer,
+    size_t control_offset,
+    uint32_t window,
+    uint32_t num_q_tokens,
+    uint32_t num_kv_tokens,
+    uint32_t num_q_heads,
+    uint32_t num_kv_heads,
+    uint32_t head_dim);
+
+enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_i8kv_store(
+    const struct gptoss_metal_command_buffer* command_buffer,
+    const struct gptoss_metal_function* f32_i8kv_store_fn,
+    const struct gptoss_metal_buffer* input_buffer,
+    size_t input_offset,
+    const struct gptoss_metal_buffer* kvcache_buffer,
+    size_t kvcache_offset,
+    const struct gptoss_metal_buffer* kvscale_buffer,
+    size_t kvscale_offset,
+    const struct gptoss_metal_buffer* control_buffer,
+    size_t control_offset,
+    uint32_t num_tokens,
+    uint32_t num_q_heads,
+    uint32_t num_kv_heads,
+    uint32_t head_dim);
+
 enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_softmax(
     const struct gptoss_metal_command_buffer* command_buffer,
     const struct gptoss_metal_function* f32_softmax_fn,
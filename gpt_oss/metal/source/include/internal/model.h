@@ -86,6 +86,8 @@ struct gptoss_model {
     struct gptoss_metal_function f32_topk_softmax_e32_k4_fn;
     struct gptoss_metal_function f32_topk_softmax_e128_k4_fn;
     struct gptoss_metal_function f32_sdpa_q8_d64_fn;
+    struct gptoss_metal_function f32_i8kv_sdpa_q8_d64_fn;
+    struct gptoss_metal_function f32_i8kv_store_fn;
     struct gptoss_metal_function f32_softmax_fn;
     struct gptoss_metal_function f32_sample_fn;
 
@@ -135,6 +137,13 @@ struct gptoss_context {
     size_t kvcache_size;
     size_t allocation_size;
 
+    // Anonymous mapping backing kvcache_buffer.
+    void* kvcache_mapping_ptr;
+    size_t kvcache_mapping_size;
+
+    // Whether the KV cache stores INT8 K/V vectors with per-vector FP16 scales in kvscale_buffer.
+    bool quantize_kvcache;
+
     // Activation buffers.
     // TODO: merge into a single buffer.
     struct gptoss_metal_buffer residual_activation_buffer;  // Residual stream
@@ -154,4 +163,5 @@ struct gptoss_context {
     struct gptoss_metal_buffer sum_buffer;
     struct gptoss_metal_buffer argmax_buffer;
     struct gptoss_metal_buffer kvcache_buffer;
+    struct gptoss_metal_buffer kvscale_buffer;  // fp16 K/V scales, only with quantize_kvcache
 };
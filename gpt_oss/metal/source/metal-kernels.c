@@ -814,6 +814,112 @@ enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_sdpa(
         /*threadgroup_buffer_size=*/half_threadgroup_size * 8 * 4 * sizeof(float));
 }
 
+enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_i8kv_sdpa(
+    const struct gptoss_metal_command_buffer* command_buffer,
+    const struct gptoss_metal_function* f32_i8kv_sdpa_fn,
+    const struct gptoss_metal_buffer* q_buffer,
+    size_t q_offset,
+    const struct gptoss_metal_buffer* k_buffer,
+    size_t k_offset,
+    const struct gptoss_metal_buffer* v_buffer,
+    size_t v_offset,
+    const struct gptoss_metal_buffer* k_scale_buffer,
+    size_t k_scale_offset,
+    const struct gptoss_metal_buffer* v_scale_buffer,
+    size_t v_scale_offset,
+    const struct gptoss_metal_buffer* s_buffer,
+    size_t s_offset,
+    const struct gptoss_metal_buffer* output_buffer,
+    size_t output_offset,
+    const struct gptoss_metal_buffer* control_buffer,
+    size_t control_offset,
+    uint32_t window,
+    uint32_t num_q_tokens,
+    uint32_t num_kv_tokens,
+    uint32_t num_q_heads,
+    uint32_t num_kv_heads,
+    uint32_t head_dim)
+{
+    if (command_buffer->object == NULL || f32_i8kv_sdpa_fn->pipeline_state_object == NULL) {
+        return gptoss_status_invalid_state;
+    }
+
+    if (num_q_heads != num_kv_heads * 8) {
+        GPTOSS_LOG_ERROR("number of Q heads (%" PRIu32 ") must be 8 times the number of KV heads (%" PRIu32 ")",
+            num_q_heads, num_kv_heads);
+        return gptoss_status_invalid_argument;
+    }
+
+    if (head_dim != 64) {
+        GPTOSS_LOG_ERROR("attention head dimension (%" PRIu32 ") must be 64", head_dim);
+        return gptoss_status_invalid_argument;
+    }
+
+    const size_t max_context_tokens = math_min(num_q_tokens + num_kv_tokens + 1, window);
+    const size_t threadgroup_size = math_min(f32_i8kv_sdpa_fn->max_threadgroup_threads,
+        max_context_tokens * f32_i8kv_sdpa_fn->simdgroup_threads);
+    const size_t half_threadgroup_size = math_round_down_po2(threadgroup_size / 2, f32_i8kv_sdpa_fn->simdgroup_threads);
+
+    const struct gptoss_sdpa_args args = {
+        .qkv_dim = head_dim * (num_q_heads + 2 * num_kv_heads),
+        .num_kv_tokens = num_kv_tokens,
+        .window = window,
+    };
+
+    return gptoss_metal_command_buffer_encode_launch_kernel(
+        command_buffer, f32_i8kv_sdpa_fn,
+        threadgroup_size, 1, 1,
+        num_q_tokens, num_kv_heads, 1,
+        sizeof(args), &args,
+        8,
+        (const struct gptoss_metal_buffer *[]) {q_buffer, k_buffer, v_buffer, k_scale_buffer, v_scale_buffer, s_buffer, output_buffer, control_buffer},
+        (const size_t[]) {q_offset, k_offset, v_offset, k_scale_offset, v_scale_offset, s_offset, output_offset, control_offset},
+        /*threadgroup_buffer_size=*/half_threadgroup_size * 8 * 4 * sizeof(float));
+}
+
+enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_i8kv_store(
+    const struct gptoss_metal_command_buffer* command_buffer,
+    const struct gptoss_metal_function* f32_i8kv_store_fn,
+    const struct gptoss_metal_buffer* input_buffer,
+    size_t input_offset,
+    const struct gptoss_metal_buffer* kvcache_buffer,
+    size_t kvcache_offset,
+    const struct gptoss_metal_buffer* kvscale_buffer,
+    size_t kvscale_offset,
+    const struct gptoss_metal_buffer* control_buffer,
+    size_t control_offset,
+    uint32_t num_tokens,
+    uint32_t num_q_heads,
+    uint32_t num_kv_heads,
+    uint32_t head_dim)
+{
+    if (command_buffer->object == NULL || f32_i8kv_store_fn->pipeline_state_object == NULL) {
+        return gptoss_status_invalid_state;
+    }
+
+    if (head_dim != 64) {
+        GPTOSS_LOG_ERROR("attention head dimension (%" PRIu32 ") must be 64", head_dim);
+        return gptoss_status_invalid_argument;
+    }
+
+    const struct gptoss_i8kv_store_args args = {
+        .input_token_stride = head_dim * (num_q_heads + 2 * num_kv_heads),
+        .output_token_stride = 2 * num_kv_heads * head_dim,
+        .scale_token_stride = 2 * num_kv_heads,
+    };
+
+    // One simdgroup per K/V head vector of each token.
+    return gptoss_metal_command_buffer_encode_launch_kernel(
+        command_buffer, f32_i8kv_store_fn,
+        f32_i8kv_store_fn->simdgroup_threads, 1, 1,
+        2 * num_kv_heads, num_tokens, 1,
+        sizeof(args), &args,
+        4,
+        (const struct gptoss_metal_buffer *[]) {input_buffer, kvcache_buffer, kvscale_buffer, control_buffer},
+        (const size_t[]) {input_offset, kvcache_offset, kvscale_offset, control_offset},
+        /*threadgroup_buffer_size=*/0);
+}
+
 enum gptoss_status gptoss_metal_command_buffer_encode_launch_f32_softmax(
     const struct gptoss_metal_command_buffer* command_buffer,
     const struct gptoss_metal_function* f32_softmax_fn,
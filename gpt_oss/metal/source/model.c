@@ -365,6 +365,14 @@ enum gptoss_status GPTOSS_ABI gptoss_model_create_from_file(
     if (status != gptoss_status_success) {
         goto cleanup;
     }
+    status = gptoss_metal_function_create(&model->library, "gptoss_f32_i8kv_sdpa_q8_d64", &model->f32_i8kv_sdpa_q8_d64_fn);
+    if (status != gptoss_status_success) {
+        goto cleanup;
+    }
+    status = gptoss_metal_function_create(&model->library, "gptoss_f32_i8kv_store", &model->f32_i8kv_store_fn);
+    if (status != gptoss_status_success) {
+        goto cleanup;
+    }
 
     // Weight buffers
     const char* current_ptr = (const char*) model->mapping_ptr;
@@ -502,6 +510,8 @@ enum gptoss_status GPTOSS_ABI gptoss_model_release(
             gptoss_metal_function_release(&model->f32_softmax_fn);
             gptoss_metal_function_release(&model->f32_sample_fn);
             gptoss_metal_function_release(&model->f32_sdpa_q8_d64_fn);
+            gptoss_metal_function_release(&model->f32_i8kv_sdpa_q8_d64_fn);
+            gptoss_metal_function_release(&model->f32_i8kv_store_fn);
             gptoss_metal_library_release(&model->library);
 
             gptoss_metal_command_queue_release(&model->command_queue);
@@ -9,41 +9,72 @@
 #pragma METAL fp math_mode(safe)
 #pragma METAL fp contract(off)
 
+constant uint sdpa_num_q_heads = 64;
+constant uint sdpa_num_kv_heads = 8;
+constant uint sdpa_head_dim = 64;
+constant uint sdpa_kv_token_stride = 2 * sdpa_num_kv_heads * sdpa_head_dim;
+constant uint sdpa_kvscale_token_stride = 2 * sdpa_num_kv_heads;
+
+// KV cache with FP32 K/V vectors.
+// Layout: [token][K heads, V heads][head_dim] in FP32.
+struct gptoss_f32_kvcache {
+    const device float* k;
+    const device float* v;
+
+    float2 load_k(uint kt, uint lane) const {
+        return reinterpret_cast<const device float2*>(k + kt * sdpa_kv_token_stride)[lane];
+    }
+
+    float2 load_v(uint kt, uint lane) const {
+        return reinterpret_cast<const device float2*>(v + kt * sdpa_kv_token_stride)[lane];
+    }
+};
+
+// KV cache with INT8 K/V vectors and one FP16 scale per head vector (group size = head_dim).
+// Layout: [token][K heads, V heads][head_dim] in INT8, [token][K heads, V heads] in FP16.
+struct gptoss_i8_kvcache {
+    const device char* k;
+    const device char* v;
+    const device half* k_scale;
+    const device half* v_scale;
+
+    float2 load_k(uint kt, uint lane) const {
+        const float2 kval = static_cast<float2>(reinterpret_cast<const device char2*>(k + kt * sdpa_kv_token_stride)[lane]);
+        return kval * static_cast<float>(k_scale[kt * sdpa_kvscale_token_stride]);
+    }
+
+    float2 load_v(uint kt, uint lane) const {
+        const float2 vval = static_cast<float2>(reinterpret_cast<const device char2*>(v + kt * sdpa_kv_token_stride)[lane]);
+        return vval * static_cast<float>(v_scale[kt * sdpa_kvscale_token_stride]);
+    }
+};
+
 // Each threadgroup handles 8 Q heads / 1 KV head for 1 token
 
-kernel void gptoss_f32_sdpa_q8_d64(
-    constant gptoss_sdpa_args& args [[ buffer(0) ]],
-    const device float* q [[ buffer(1) ]],
-    const device float* k [[ buffer(2) ]],
-    const device float* v [[ buffer(3) ]],
-    const device bfloat* s [[ buffer(4) ]],
-    device float* output [[ buffer(5) ]],
-    const device gptoss_control* control [[ buffer(6) ]],
-    threadgroup void* threadgroup_buffer [[ threadgroup(0) ]],
-    uint2 gid [[threadgroup_position_in_grid]],
-    uint2 tid [[thread_position_in_threadgroup]],
-    uint simdgroup_tid [[thread_index_in_simdgroup]],
-    uint simdgroup_idx [[simdgroup_index_in_threadgroup]],
-    uint num_simdgroups [[simdgroups_per_threadgroup]])
+template <typename KVCache>
+inline void sdpa_q8_d64(
+    constant gptoss_sdpa_args& args,
+    const device float* q,
+    KVCache kvcache,
+    const device bfloat* s,
+    device float* output,
+    threadgroup void* threadgroup_buffer,
+    uint2 gid,
+    uint2 tid,
+    uint simdgroup_tid,
+    uint simdgroup_idx,
+    uint num_simdgroups)
 {
     const uint simdgroup_size = 32;
-    if (control->abort != 0) {
-        return;
-    }
 
-    const uint num_q_heads = 64;
-    const uint num_kv_heads = 8;
-    const uint head_dim = 64;
+    const uint num_q_heads = sdpa_num_q_heads;
+    const uint head_dim = sdpa_head_dim;
     const uint qmul = 8;
 
-    const uint token_stride = 2 * num_kv_heads * head_dim;
-
     const uint qt = gid.x;  // Q token index
     const uint h = gid.y;   // KV head index
 
     q += qt * args.qkv_dim + h * (qmul * head_dim);
-    k += h * head_dim;
-    v += h * head_dim;
     output += qt * (num_q_heads * head_dim) + h * (qmul * head_dim);
 
     float m0 = static_cast<float>(s[h * qmul + 0]);
@@ -84,11 +115,8 @@ kernel void gptoss_f32_sdpa_q8_d64(
 
     const uint kt_end = qt + args.num_kv_tokens + 1;
     const uint kt_start = metal::subsat(kt_end, args.window) + simdgroup_idx;
-    k += token_stride * kt_start;
-    v += token_stride * kt_start;
     for (uint kt = kt_start; kt < kt_end; kt += num_simdgroups) {
-        const float2 kval = reinterpret_cast<const device float2*>(k)[simdgroup_tid];
-        k += token_stride * num_simdgroups;
+        const float2 kval = kvcache.load_k(kt, simdgroup_tid);
 
         float qk0 = metal::dot(q0, kval);
         float qk1 = metal::dot(q1, kval);
@@ -153,8 +181,7 @@ kernel void gptoss_f32_sdpa_q8_d64(
         m6 = new_m6;
         m7 = new_m7;
 
-        const float2 vval = reinterpret_cast<const device float2*>(v)[simdgroup_tid];
-        v += token_stride * num_simdgroups;
+        const float2 vval = kvcache.load_v(kt, simdgroup_tid);
         out0 = metal::fma(vval, qk0, out0 * alpha0);
         out1 = metal::fma(vval, qk1, out1 * alpha1);
         out2 = metal::fma(vval, qk2, out2 * alpha2);
@@ -296,3 +323,98 @@ kernel void gptoss_f32_sdpa_q8_d64(
         reinterpret_cast<device float2*>(output + 7 * head_dim)[simdgroup_tid] = out7 / l7;
     }
 }
+
+kernel void gptoss_f32_sdpa_q8_d64(
+    constant gptoss_sdpa_args& args [[ buffer(0) ]],
+    const device float* q [[ buffer(1) ]],
+    const device float* k [[ buffer(2) ]],
+    const device float* v [[ buffer(3) ]],
+    const device bfloat* s [[ buffer(4) ]],
+    device float* output [[ buffer(5) ]],
+    const device gptoss_control* control [[ buffer(6) ]],
+    threadgroup void* threadgroup_buffer [[ threadgroup(0) ]],
+    uint2 gid [[threadgroup_position_in_grid]],
+    uint2 tid [[thread_position_in_threadgroup]],
+    uint simdgroup_tid [[thread_index_in_simdgroup]],
+    uint simdgroup_idx [[simdgroup_index_in_threadgroup]],
+    uint num_simdgroups [[simdgroups_per_threadgroup]])
+{
+    if (control->abort != 0) {
+        return;
+    }
+
+    const uint h = gid.y;  // KV head index
+    const gptoss_f32_kvcache kvcache = {
+        k + h * sdpa_head_dim,
+        v + h * sdpa_head_dim,
+    };
+    sdpa_q8_d64(args, q, kvcache, s, output, threadgroup_buffer, gid, tid, simdgroup_tid, simdgroup_idx, num_simdgroups);
+}
+
+kernel void gptoss_f32_i8kv_sdpa_q8_d64(
+    constant gptoss_sdpa_args& args [[ buffer(0) ]],
+    const device float* q [[ buffer(1) ]],
+    const device char* k [[ buffer(2) ]],
+    const device char* v [[ buffer(3) ]],
+    const device half* k_scale [[ buffer(4) ]],
+    const device half* v_scale [[ buffer(5) ]],
+    const device bfloat* s [[ buffer(6) ]],
+    device float* output [[ buffer(7) ]],
+    const device gptoss_control* control [[ buffer(8) ]],
+    threadgroup void* threadgroup_buffer [[ threadgroup(0) ]],
+    uint2 gid [[threadgroup_position_in_grid]],
+    uint2 tid [[thread_position_in_threadgroup]],
+    uint simdgroup_tid [[thread_index_in_simdgroup]],
+    uint simdgroup_idx [[simdgroup_index_in_threadgroup]],
+    uint num_simdgroups [[simdgroups_per_threadgroup]])
+{
+    if (control->abort != 0) {
+        return;
+    }
+
+    const uint h = gid.y;  // KV head index
+    const gptoss_i8_kvcache kvcache = {
+        k + h * sdpa_head_dim,
+        v + h * sdpa_head_dim,
+        k_scale + h,
+        v_scale + h,
+    };
+    sdpa_q8_d64(args, q, kvcache, s, output, threadgroup_buffer, gid, tid, simdgroup_tid, simdgroup_idx, num_simdgroups);
+}
+
+// Quantizes the K/V vectors of one token into the INT8 KV cache.
+// Each simdgroup handles one head vector (64 elements), with one FP16 scale per vector.
+
+kernel void gptoss_f32_i8kv_store(
+    constant gptoss_i8kv_store_args& args [[ buffer(0) ]],
+    const device float* input [[ buffer(1) ]],
+    device char* kvcache [[ buffer(2) ]],
+    device half* kvscale [[ buffer(3) ]],
+    const device gptoss_control* control [[ buffer(4) ]],
+    uint2 gid [[threadgroup_position_in_grid]],
+    uint simdgroup_tid [[thread_index_in_simdgroup]])
+{
+    if (control->abort != 0) {
+        return;
+    }
+
+    const uint h = gid.x;  // K or V head index
+    const uint t = gid.y;  // Token index
+
+    input += t * args.input_token_stride + h * sdpa_head_dim;
+    kvcache += t * args.output_token_stride + h * sdpa_head_dim;
+    kvscale += t * args.scale_token_stride + h;
+
+    const float2 val = reinterpret_cast<const device float2*>(input)[simdgroup_tid];
+    const float2 absval = metal::fabs(val);
+    const float absmax = metal::simd_max(metal::max(absval.x, absval.y));
+    // Quantize against the FP16-rounded scale so that dequantization is consistent with it.
+    const half scale = static_cast<half>(absmax * (1.0f / 127.0f));
+    const float inv_scale = scale != 0.0h ? 1.0f / static_cast<float>(scale) : 0.0f;
+
+    const float2 qval = metal::clamp(metal::rint(val * inv_scale), float2(-127.0f), float2(127.0f));
+    reinterpret_cast<device char2*>(kvcache)[simdgroup_tid] = static_cast<char2>(qval);
+    if (metal::simd_is_first()) {
+        *kvscale = scale;
+    }
+}
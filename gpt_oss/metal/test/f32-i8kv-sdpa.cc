@@ -0,0 +1,52 @@
+#include <gtest/gtest.h>
+
+#include <cstdint>
+
+#include "sdpa-kernel-tester.hpp"
+
+
+using gptoss::SDPAKernelTester;
+
+constexpr std::uint32_t kAttentionWindow = 8;
+
+
+TEST(F32_I8KV_STORE, single_token) {
+    SDPAKernelTester()
+        .num_q_tokens(1)
+        .TestF32_I8KV_Store();
+}
+
+TEST(F32_I8KV_STORE, multiple_tokens) {
+    SDPAKernelTester()
+        .num_q_tokens(5)
+        .TestF32_I8KV_Store();
+}
+
+TEST(F32_I8KV_SDPA, prefill) {
+    SDPAKernelTester()
+        .num_q_tokens(4)
+        .num_kv_tokens(0)
+        .TestF32_I8KV_SDPA();
+}
+
+TEST(F32_I8KV_SDPA, decode) {
+    SDPAKernelTester()
+        .num_q_tokens(1)
+        .num_kv_tokens(37)
+        .TestF32_I8KV_SDPA();
+}
+
+TEST(F32_I8KV_SDPA, long_context) {
+    SDPAKernelTester()
+        .num_q_tokens(1)
+        .num_kv_tokens(1023)
+        .TestF32_I8KV_SDPA();
+}
+
+TEST(F32_I8KV_SDPA, sliding_window) {
+    SDPAKernelTester()
+        .num_q_tokens(3)
+        .num_kv_tokens(29)
+        .window(kAttentionWindow)
+        .TestF32_I8KV_SDPA();
+}
@@ -0,0 +1,312 @@
+#pragma once
+
+#include <gtest/gtest.h>
+
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+
+#include <internal/datatype.hpp>
+#include <internal/metal.hpp>
+#include <internal/metal-kernels.h>
+
+
+namespace gptoss {
+
+class SDPAKernelTester {
+public:
+    SDPAKernelTester() { }
+
+    SDPAKernelTester(const SDPAKernelTester&) = delete;
+    SDPAKernelTester(SDPAKernelTester&&) = delete;
+    SDPAKernelTester& operator=(const SDPAKernelTester&) = delete;
+    SDPAKernelTester& operator=(SDPAKernelTester&&) = delete;
+
+    [[nodiscard]]
+    SDPAKernelTester& num_q_tokens(std::uint32_t num_q_tokens) {
+        num_q_tokens_ = num_q_tokens;
+        return *this;
+    }
+
+    std::uint32_t num_q_tokens() const {
+        return num_q_tokens_;
+    }
+
+    [[nodiscard]]
+    SDPAKernelTester& num_kv_tokens(std::uint32_t num_kv_tokens) {
+        num_kv_tokens_ = num_kv_tokens;
+        return *this;
+    }
+
+    std::uint32_t num_kv_tokens() const {
+        return num_kv_tokens_;
+    }
+
+    // Tokens held in the KV cache: the preceding context followed by the Q tokens themselves.
+    std::uint32_t num_cache_tokens() const {
+        return num_kv_tokens() + num_q_tokens();
+    }
+
+    [[nodiscard]]
+    SDPAKernelTester& window(std::uint32_t window) {
+        window_ = window;
+        return *this;
+    }
+
+    std::uint32_t window() const {
+        return window_;
+    }
+
+    std::uint32_t num_q_heads() const {
+        return kNumQHeads;
+    }
+
+    std::uint32_t num_kv_heads() const {
+        return kNumKVHeads;
+    }
+
+    std::uint32_t head_dim() const {
+        return kHeadDim;
+    }
+
+    std::uint32_t qkv_dim() const {
+        return (num_q_heads() + 2 * num_kv_heads()) * head_dim();
+    }
+
+    std::uint32_t kv_token_stride() const {
+        return 2 * num_kv_heads() * head_dim();
+    }
+
+    void Validate() const {
+        ASSERT_NE(num_q_tokens(), 0);
+        ASSERT_NE(window(), 0);
+    }
+
+    void TestF32_I8KV_Store() const {
+        Validate();
+
+        metal::Buffer input_buffer{device_, num_q_tokens() * qkv_dim() * sizeof(float)};
+        metal::Buffer kvcache_buffer{device_, num_q_tokens() * kv_token_stride() * sizeof(std::int8_t)};
+        metal::Buffer kvscale_buffer{device_, num_q_tokens() * 2 * num_kv_heads() * sizeof(gptoss_float16)};
+        metal::Buffer control_buffer{device_, sizeof(gptoss_control)};
+        std::memset(control_buffer.ptr(), 0, sizeof(gptoss_control));
+
+        metal::CommandBuffer command_buffer{command_queue_};
+
+        command_buffer.encode_launch_f32_fill_random(
+            f32_fill_random_fn_,
+            /*threadgroup_size=*/0,
+            /*max_threadgroups=*/kFillRandomMaxThreadgroups,
+            /*output_buffer=*/input_buffer,
+            /*output_offset=*/0,
+            num_q_tokens() * qkv_dim(),
+            kSeed, /*offset=*/0, /*min=*/-4.0f, /*max=*/4.0);
+
+        // Quantize the K/V part of the QKV activations, as the context does when filling the KV cache.
+        Check(gptoss_metal_command_buffer_encode_launch_f32_i8kv_store(
+                command_buffer.handle(),
+                f32_i8kv_store_fn_.handle(),
+                input_buffer.handle(),
+                /*input_offset=*/num_q_heads() * head_dim() * sizeof(float),
+                kvcache_buffer.handle(),
+                /*kvcache_offset=*/0,
+                kvscale_buffer.handle(),
+                /*kvscale_offset=*/0,
+                control_buffer.handle(),
+                /*control_offset=*/0,
+                num_q_tokens(),
+                num_q_heads(),
+                num_kv_heads(),
+                head_dim()),
+            "gptoss_metal_command_buffer_encode_launch_f32_i8kv_store");
+
+        command_buffer.commit();
+        command_buffer.wait_completion();
+
+        const float* input_ptr = static_cast<const float*>(input_buffer.ptr());
+        const std::int8_t* kvcache_ptr = static_cast<const std::int8_t*>(kvcache_buffer.ptr());
+        const gptoss_float16* kvscale_ptr = static_cast<const gptoss_float16*>(kvscale_buffer.ptr());
+        for (std::uint32_t t = 0; t < num_q_tokens(); t++) {
+            for (std::uint32_t h = 0; h < 2 * num_kv_heads(); h++) {
+                const float* head_input_ptr = input_ptr + t * qkv_dim() + (num_q_heads() + h) * head_dim();
+                double absmax = 0.0;
+                for (std::uint32_t d = 0; d < head_dim(); d++) {
+                    absmax = std::fmax(absmax, std::abs(static_cast<double>(head_input_ptr[d])));
+                }
+
+                const double ref_scale = absmax / 127.0;
+                const double scale = upcast<double>(kvscale_ptr[t * 2 * num_kv_heads() + h]);
+                // The scale is stored in FP16, which has an 11-bit significand.
+                ASSERT_NEAR(scale, ref_scale, ref_scale * 1.0e-3)
+                    << "at head " << h << " / " << 2 * num_kv_heads() << ", token " << t << " / " << num_q_tokens();
+
+                for (std::uint32_t d = 0; d < head_dim(); d++) {
+                    const std::int8_t qval = kvcache_ptr[t * kv_token_stride() + h * head_dim() + d];
+                    ASSERT_GE(qval, -127);
+                    const double input = static_cast<double>(head_input_ptr[d]);
+                    const double dequantized = static_cast<double>(qval) * scale;
+                    ASSERT_NEAR(dequantized, input, 0.5 * scale * (1.0 + 1.0e-3))
+                        << "at dim " << d << " / " << head_dim() << ", head " << h << " / " << 2 * num_kv_heads()
+                        << ", token " << t << " / " << num_q_tokens() << ", scale " << scale;
+                }
+            }
+        }
+    }
+
+    void TestF32_I8KV_SDPA() const {
+        Validate();
+
+        metal::Buffer q_buffer{device_, num_q_tokens() * qkv_dim() * sizeof(float)};
+        metal::Buffer f32_kvcache_buffer{device_, num_cache_tokens() * kv_token_stride() * sizeof(float)};
+        metal::Buffer i8_kvcache_buffer{device_, num_cache_tokens() * kv_token_stride() * sizeof(std::int8_t)};
+        metal::Buffer kvscale_buffer{device_, num_cache_tokens() * 2 * num_kv_heads() * sizeof(gptoss_float16)};
+        metal::Buffer sink_buffer{device_, num_q_heads() * sizeof(gptoss_bfloat16)};
+        metal::Buffer f32_output_buffer{device_, num_q_tokens() * num_q_heads() * head_dim() * sizeof(float)};
+        metal::Buffer i8kv_output_buffer{device_, num_q_tokens() * num_q_heads() * head_dim() * sizeof(float)};
+        metal::Buffer control_buffer{device_, sizeof(gptoss_control)};
+        std::memset(control_buffer.ptr(), 0, sizeof(gptoss_control));
+
+        metal::CommandBuffer command_buffer{command_queue_};
+
+        // Q is pre-scaled by 1/sqrt(head_dim) in the model; keep the logits in a similar range here.
+        command_buffer.encode_launch_f32_fill_random(
+            f32_fill_random_fn_,
+            /*threadgroup_size=*/0,
+            /*max_threadgroups=*/kFillRandomMaxThreadgroups,
+            /*output_buffer=*/q_buffer,
+            /*output_offset=*/0,
+            num_q_tokens() * qkv_dim(),
+            kSeed, /*offset=*/0, /*min=*/-0.125f, /*max=*/0.125f);
+
+        command_buffer.encode_launch_f32_fill_random(
+            f32_fill_random_fn_,
+            /*threadgroup_size=*/0,
+            /*max_threadgroups=*/kFillRandomMaxThreadgroups,
+            /*output_buffer=*/f32_kvcache_buffer,
+            /*output_offset=*/0,
+            num_cache_tokens() * kv_token_stride(),
+            kSeed + 1, /*offset=*/0, /*min=*/-1.0f, /*max=*/1.0);
+
+        command_buffer.encode_launch_bf16_fill_random(
+            bf16_fill_random_fn_,
+            /*threadgroup_size=*/0,
+            /*max_threadgroups=*/kFillRandomMaxThreadgroups,
+            /*output_buffer=*/sink_buffer,
+            /*output_offset=*/0,
+            num_q_heads(),
+            kSeed + 2, /*offset=*/0, /*min=*/-1.0f, /*max=*/1.0);
+
+        // Build the INT8 KV cache from the FP32 one: with no Q heads the input token stride matches the cache.
+        Check(gptoss_metal_command_buffer_encode_launch_f32_i8kv_store(
+                command_buffer.handle(),
+                f32_i8kv_store_fn_.handle(),
+                f32_kvcache_buffer.handle(),
+                /*input_offset=*/0,
+                i8_kvcache_buffer.handle(),
+                /*kvcache_offset=*/0,
+                kvscale_buffer.handle(),
+                /*kvscale_offset=*/0,
+                control_buffer.handle(),
+                /*control_offset=*/0,
+                num_cache_tokens(),
+                /*num_q_heads=*/0,
+                num_kv_heads(),
+                head_dim()),
+            "gptoss_metal_command_buffer_encode_launch_f32_i8kv_store");
+
+        Check(gptoss_metal_command_buffer_encode_launch_f32_sdpa(
+                command_buffer.handle(),
+                f32_sdpa_fn_.handle(),
+                q_buffer.handle(),
+                /*q_offset=*/0,
+                f32_kvcache_buffer.handle(),
+                /*k_offset=*/0,
+                f32_kvcache_buffer.handle(),
+                /*v_offset=*/num_kv_heads() * head_dim() * sizeof(float),
+                sink_buffer.handle(),
+                /*s_offset=*/0,
+                f32_output_buffer.handle(),
+                /*output_offset=*/0,
+                control_buffer.handle(),
+                /*control_offset=*/0,
+                window(),
+                num_q_tokens(),
+                num_kv_tokens(),
+                num_q_heads(),
+                num_kv_heads(),
+                head_dim()),
+            "gptoss_metal_command_buffer_encode_launch_f32_sdpa");
+
+        Check(gptoss_metal_command_buffer_encode_launch_f32_i8kv_sdpa(
+                command_buffer.handle(),
+                f32_i8kv_sdpa_fn_.handle(),
+                q_buffer.handle(),
+                /*q_offset=*/0,
+                i8_kvcache_buffer.handle(),
+                /*k_offset=*/0,
+                i8_kvcache_buffer.handle(),
+                /*v_offset=*/num_kv_heads() * head_dim() * sizeof(std::int8_t),
+                kvscale_buffer.handle(),
+                /*k_scale_offset=*/0,
+                kvscale_buffer.handle(),
+                /*v_scale_offset=*/num_kv_heads() * sizeof(gptoss_float16),
+                sink_buffer.handle(),
+                /*s_offset=*/0,
+                i8kv_output_buffer.handle(),
+                /*output_offset=*/0,
+                control_buffer.handle(),
+                /*control_offset=*/0,
+                window(),
+                num_q_tokens(),
+                num_kv_tokens(),
+                num_q_heads(),
+                num_kv_heads(),
+                head_dim()),
+            "gptoss_metal_command_buffer_encode_launch_f32_i8kv_sdpa");
+
+        command_buffer.commit();
+        command_buffer.wait_completion();
+
+        const float* f32_output_ptr = static_cast<const float*>(f32_output_buffer.ptr());
+        const float* i8kv_output_ptr = static_cast<const float*>(i8kv_output_buffer.ptr());
+        for (std::uint32_t t = 0; t < num_q_tokens(); t++) {
+            for (std::uint32_t h = 0; h < num_q_heads(); h++) {
+                for (std::uint32_t d = 0; d < head_dim(); d++) {
+                    const std::size_t idx = (t * num_q_heads() + h) * head_dim() + d;
+                    const double ref_output = static_cast<double>(f32_output_ptr[idx]);
+                    const double output = static_cast<double>(i8kv_output_ptr[idx]);
+                    ASSERT_TRUE(std::isfinite(ref_output));
+                    ASSERT_NEAR(output, ref_output, kI8KVTolerance)
+                        << "at dim " << d << " / " << head_dim() << ", head " << h << " / " << num_q_heads()
+                        << ", token " << t << " / " << num_q_tokens();
+                }
+            }
+        }
+    }
+
+private:
+    // Geometry fixed in the q8_d64 SDPA kernels.
+    static constexpr std::uint32_t kNumQHeads = 64;
+    static constexpr std::uint32_t kNumKVHeads = 8;
+    static constexpr std::uint32_t kHeadDim = 64;
+    // INT8 K/V with a per-vector scale bounds the per-element error by absmax / 254.
+    static constexpr double kI8KVTolerance = 1.0e-2;
+
+    static constexpr std::uint64_t kSeed{UINT64_C(1019827666124465388)};
+    static constexpr std::size_t kFillRandomMaxThreadgroups = 10;
+
+    metal::Device device_{};
+    metal::CommandQueue command_queue_{device_};
+    metal::Library library_{device_};
+    metal::Function f32_fill_random_fn_{library_, "gptoss_f32_fill_random"};
+    metal::Function bf16_fill_random_fn_{library_, "gptoss_bf16_fill_random"};
+    metal::Function f32_sdpa_fn_{library_, "gptoss_f32_sdpa_q8_d64"};
+    metal::Function f32_i8kv_sdpa_fn_{library_, "gptoss_f32_i8kv_sdpa_q8_d64"};
+    metal::Function f32_i8kv_store_fn_{library_, "gptoss_f32_i8kv_store"};
+    std::uint32_t num_q_tokens_{1};
+    std::uint32_t num_kv_tokens_{0};
+    std::uint32_t window_{UINT32_MAX};
+};
+
+}  // namespace gptoss
@@ -1,6 +1,7 @@
 import os
 import datetime
 import uuid
+from contextlib import asynccontextmanager
 from typing import Callable, Literal, Optional
 
 from fastapi import FastAPI, Request
@@ -20,7 +21,7 @@ from openai_harmony import (
 )
 
 from gpt_oss.tools.python_docker.docker_tool import PythonTool
-from gpt_oss.tools.simple_browser import SimpleBrowserTool
+from gpt_oss.tools.simple_browser import SimpleBrowserTool, close_shared_session
 from gpt_oss.tools.simple_browser.backend import YouComBackend, ExaBackend
 
 from .events import (
@@ -85,7 +86,12 @@ def is_not_builtin_tool(recipient: str) -> bool:
 def create_api_server(
     infer_next_token: Callable[[list[int], float], int], encoding: HarmonyEncoding
 ) -> FastAPI:
-    app = FastAPI()
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await close_shared_session()
+
+    app = FastAPI(lifespan=lifespan)
     responses_store: dict[str, tuple[ResponsesRequest, ResponseObject]] = {}
 
     def generate_response(
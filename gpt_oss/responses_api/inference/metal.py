@@ -1,43 +1,96 @@
 """Metal backend for :mod:`gpt_oss.responses_api`."""
 
+from array import array
+from collections import deque
 from typing import Callable
 
 from gpt_oss.metal import Context, Model
 
 
 # Tunables
-MAX_OUTPUT_TOKENS = 100
+SAMPLE_BATCH_TOKENS = 16  # tokens decoded per context.sample() call
+MAX_CONTEXT_TOKENS = 0  # 0 = use the model's full context length
 
 
-def setup_model(checkpoint: str) -> Callable[[list[int], float], int]:
-    """Load the Metal model and return an inference function."""
+def setup_model(
+    checkpoint: str,
+    max_context: int = MAX_CONTEXT_TOKENS,
+    quantize_kv: bool = True,
+    is_stop: Callable[[int], bool] | None = None,
+) -> Callable[[list[int], float], int]:
+    """Load the Metal model and return an inference function.
+
+    The KV cache for ``max_context`` tokens is allocated once, up front, when
+    the context is created. With ``quantize_kv`` it is stored in INT8 with
+    per-head FP16 scales instead of FP32.
+
+    Tokens are decoded ``SAMPLE_BATCH_TOKENS`` at a time and the next batch is
+    only sampled once the caller has consumed the previous one, continuing
+    from the KV cache without re-prefilling. If ``is_stop`` is given, tokens
+    sampled after the first stop token in a batch are never handed out.
+    """
 
     model = Model(checkpoint)
-    context = Context(model)
+    context = Context(model, context_length=max_context, quantize_kv=quantize_kv)
 
     seed = 0
-    output_tokens = []
+    output_tokens: deque[int] = deque()
+    # Mirror of the tokens currently held by `context` (prompt + sampled).
+    prompt_tokens: list[int] = []
 
     def infer_next_token(
         tokens: list[int], temperature: float = 0.0, new_request: bool = False
     ) -> int:
-        """Infer next token using incremental LCP caching when possible."""
-        nonlocal output_tokens
+        """Infer next token, reusing the context when `tokens` extends it."""
+        nonlocal prompt_tokens
 
         if new_request:
-            output_tokens = []
+            output_tokens.clear()
 
         if len(output_tokens) == 0:
-            # Context handles LCP caching internally; if `tokens` matches the
-            # tokens in the KV cache, the KV cache is reused after reset+append.
-            context.reset()
-            for t in tokens:
-                context.append(t)
+            num_cached_tokens = len(prompt_tokens)
+            # A list slice comparison runs at C speed; on divergence the native
+            # append finds the common prefix itself.
+            extends_context = tokens[:num_cached_tokens] == prompt_tokens
+            try:
+                if extends_context:
+                    # The context already holds a prefix of `tokens`: only the
+                    # delta needs to cross into the native context.
+                    new_tokens = tokens[num_cached_tokens:]
+                else:
+                    # Context has no truncate API; reset+append lets it reuse
+                    # the KV cache for the leading tokens that still match.
+                    context.reset()
+                    new_tokens = tokens
+                if new_tokens:
+                    context.append_tokens(array("I", new_tokens))
+
+                max_output_tokens = min(SAMPLE_BATCH_TOKENS,
+                                        context.max_tokens - context.num_tokens)
+                if max_output_tokens == 0:
+                    raise RuntimeError("Metal context is full")
+                sampled = context.sample(max_output_tokens=max_output_tokens,
+                                         temperature=temperature,
+                                         seed=seed)
+            except Exception:
+                # The context may hold only part of the appended tokens (e.g.
+                # on overflow); drop it so the mirror never claims more.
+                context.reset()
+                prompt_tokens = []
+                raise
 
-            output_tokens = context.sample(max_output_tokens=MAX_OUTPUT_TOKENS,
-                                           temperature=temperature,
-                                           seed=seed)
+            if extends_context:
+                prompt_tokens.extend(new_tokens)
+            else:
+                prompt_tokens = list(tokens)
+            prompt_tokens.extend(sampled)
+            if is_stop is not None:
+                for i, token in enumerate(sampled):
+                    if is_stop(token):
+                        sampled = sampled[:i + 1]
+                        break
+            output_tokens.extend(sampled)
 
-        return int(output_tokens.pop(0))
+        return int(output_tokens.popleft())
 
     return infer_next_token
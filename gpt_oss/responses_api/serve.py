@@ -54,5 +54,10 @@ if __name__ == "__main__":
 
     encoding = load_harmony_encoding(HarmonyEncodingName.HARMONY_GPT_OSS)
 
-    infer_next_token = setup_model(args.checkpoint)
+    if args.inference_backend == "metal":
+        # Lets the Metal backend stop handing out a sampled batch at the first stop token.
+        stop_tokens = set(encoding.stop_tokens_for_assistant_actions())
+        infer_next_token = setup_model(args.checkpoint, is_stop=stop_tokens.__contains__)
+    else:
+        infer_next_token = setup_model(args.checkpoint)
     uvicorn.run(create_api_server(infer_next_token, encoding), port=args.port)
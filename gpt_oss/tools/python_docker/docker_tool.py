@@ -1,13 +1,16 @@
 # Run this before running the tool:
 # $ docker image pull python:3.11
+import atexit
 import io
 import tarfile
+import threading
 from typing import Any, AsyncIterator
 import tempfile
 import os
+import struct
 import subprocess
+from uuid import uuid4
 
-import docker
 from openai_harmony import (
     Author,
     Content,
@@ -20,6 +23,13 @@ from openai_harmony import (
 from ..tool import Tool
 
 _docker_client = None
+# Long-lived container shared by all calls; scripts run in it via `exec_run`.
+_docker_container = None
+_docker_lock = threading.Lock()
+
+# Warm `uv run` interpreter used by `call_python_script_with_uv`.
+_uv_worker = None
+_uv_worker_lock = threading.Lock()
 
 PYTHON_EXECUTION_BACKEND = "docker"
 
@@ -27,21 +37,76 @@ if os.environ.get("PYTHON_EXECUTION_BACKEND") == "dangerously_use_uv":
     PYTHON_EXECUTION_BACKEND = "dangerously_use_uv"
 
 
+def _remove_docker_container() -> None:
+    global _docker_container
+    with _docker_lock:
+        if _docker_container is not None:
+            import docker
+
+            try:
+                _docker_container.remove(force=True)
+            except docker.errors.APIError:
+                pass
+            _docker_container = None
+
+
+def _get_docker_container():
+    """
+    Return the shared container, creating and starting it on first use.
+    """
+    import docker
+
+    global _docker_client, _docker_container
+    with _docker_lock:
+        if _docker_client is None:
+            _docker_client = docker.from_env()
+            # pull image `python:3.11` if not present
+            try:
+                _docker_client.images.get("python:3.11")
+            except docker.errors.ImageNotFound:
+                _docker_client.images.pull("python:3.11")
+        if _docker_container is None:
+            container = _docker_client.containers.create(
+                "python:3.11", command="sleep infinity", detach=True
+            )
+            try:
+                container.start()
+                container.exec_run("mkdir -p /tmp/scripts")
+            except Exception:
+                container.remove(force=True)
+                raise
+            _docker_container = container
+        return _docker_container
+
+
+def _discard_docker_container(container) -> None:
+    """
+    Forget `container` if it is still the shared one, and remove it.
+    """
+    import docker
+
+    global _docker_container
+    with _docker_lock:
+        if _docker_container is container:
+            _docker_container = None
+    try:
+        container.remove(force=True)
+    except docker.errors.APIError:
+        pass
+
+
+atexit.register(_remove_docker_container)
+
+
 def call_python_script(script: str) -> str:
     """
     Call a python script by writing it to a file in the container and executing it.
     """
-    global _docker_client
-    if _docker_client is None:
-        _docker_client = docker.from_env()
-        # pull image `python:3.11` if not present
-        try:
-            _docker_client.images.get("python:3.11")
-        except docker.errors.ImageNotFound:
-            _docker_client.images.pull("python:3.11")
+    import docker
 
     # 1. Create a temporary tar archive containing the script
-    script_name = "script.py"
+    script_name = f"{uuid4().hex}.py"
+    script_path = f"/tmp/scripts/{script_name}"
     tarstream = io.BytesIO()
     with tarfile.open(fileobj=tarstream, mode="w") as tar:
         script_bytes = script.encode("utf-8")
@@ -50,27 +115,101 @@ def call_python_script(script: str) -> str:
         tar.addfile(tarinfo, io.BytesIO(script_bytes))
     tarstream.seek(0)
 
-    # 2. Start the container
-    container = _docker_client.containers.create(
-        "python:3.11", command="sleep infinity", detach=True
-    )
+    # 2. Put the script into the shared container and execute it, removing it
+    # in the same exec. The archive is streamed from `tarstream` rather than
+    # copied out with `.read()`.
+    for attempt in range(2):
+        container = _get_docker_container()
+        tarstream.seek(0)
+        try:
+            container.put_archive(path="/tmp/scripts", data=tarstream)
+            exec_result = container.exec_run(
+                ["sh", "-c", f"python {script_path}; rm -f {script_path}"]
+            )
+            break
+        except docker.errors.APIError as e:
+            # 404: the container was removed; 409: it is no longer running
+            # (e.g. daemon restart or OOM). Either way the script has not run,
+            # so replace the container and try once more.
+            if attempt or not (
+                isinstance(e, docker.errors.NotFound) or e.status_code == 409
+            ):
+                raise
+            _discard_docker_container(container)
+
+    output = exec_result.output.decode("utf-8")
+    return output
+
+
+# Reads length-prefixed scripts from stdin and forks a child per script, so
+# every script gets a pristine interpreter (modules, cwd, environment) without
+# paying for startup. The child mirrors `python script.py`: the script is run
+# from a file as the real `__main__` module, non-daemon threads are joined and
+# atexit handlers run before it exits. Its fd 1 is pointed at a temporary
+# file, which captures output at the fd level like `subprocess.run` does; the
+# contents are written back length-prefixed. The protocol uses duplicates of
+# the original stdin/stdout so that scripts cannot corrupt it.
+_UV_WORKER_LOOP = """
+import atexit, os, runpy, struct, sys, tempfile, threading, traceback
+proto_in = os.fdopen(os.dup(0), "rb")
+proto_out = os.fdopen(os.dup(1), "wb")
+devnull = os.open(os.devnull, os.O_RDWR)
+os.dup2(devnull, 0)
+os.dup2(devnull, 1)
+
+
+def run(script_path, output_fd):
+    proto_in.close()
+    proto_out.close()
+    os.dup2(output_fd, 1)
+    sys.argv = [script_path]
+    sys.path[0] = os.path.dirname(script_path)
+    exit_code = 0
     try:
-        container.start()
-        # 3. Put the script into the container
-        container.put_archive(path="/tmp", data=tarstream.read())
-        # 4. Execute the script
-        exec_result = container.exec_run(f"python /tmp/{script_name}")
-        output = exec_result.output.decode("utf-8")
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        # Same order as interpreter shutdown: join threads, then run atexit.
+        threading._shutdown()
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
     finally:
-        container.remove(force=True)
-    return output
+        os._exit(exit_code)
 
 
-def call_python_script_with_uv(script: str) -> str:
-    """
-    Call a python script by writing it to a file to a temporary directory
-    and executing it with uv.
-    """
+while True:
+    header = proto_in.read(8)
+    if len(header) < 8:
+        break
+    (size,) = struct.unpack(">Q", header)
+    script = proto_in.read(size)
+    if len(script) < size:
+        break
+    with tempfile.TemporaryDirectory() as temp_dir, tempfile.TemporaryFile() as output:
+        script_path = os.path.join(temp_dir, "script.py")
+        with open(script_path, "wb") as f:
+            f.write(script)
+        pid = os.fork()
+        if pid == 0:
+            run(script_path, output.fileno())
+        os.waitpid(pid, 0)
+        output.seek(0)
+        data = output.read()
+    proto_out.write(struct.pack(">Q", len(data)) + data)
+    proto_out.flush()
+"""
+
+
+def _run_python_script_with_uv(script: str) -> str:
     with tempfile.TemporaryDirectory() as temp_dir:
         script_path = os.path.join(temp_dir, "script.py")
         with open(script_path, "w") as f:
@@ -81,6 +220,59 @@ def call_python_script_with_uv(script: str) -> str:
         return exec_result.stdout.decode("utf-8")
 
 
+def _kill_uv_worker() -> None:
+    global _uv_worker
+    if _uv_worker is not None:
+        _uv_worker.kill()
+        _uv_worker.wait()
+        _uv_worker = None
+
+
+def call_python_script_with_uv(script: str) -> str:
+    """
+    Call a python script in a process forked from a warm interpreter started
+    with uv.
+
+    Falls back to running the script in a fresh `uv run` process if the
+    worker cannot be started or reached before the script is sent. A script
+    that has been sent is never run a second time.
+    """
+    global _uv_worker
+    if not hasattr(os, "fork"):
+        return _run_python_script_with_uv(script)
+
+    script_bytes = script.encode("utf-8")
+    with _uv_worker_lock:
+        try:
+            if _uv_worker is None or _uv_worker.poll() is not None:
+                _uv_worker = subprocess.Popen(
+                    ["uv", "run", "--no-project", "python", "-u", "-c", _UV_WORKER_LOOP],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            _uv_worker.stdin.write(struct.pack(">Q", len(script_bytes)) + script_bytes)
+            _uv_worker.stdin.flush()
+        except OSError:
+            # The worker only runs a script once it has read all of it, so a
+            # failed write means the script has not run.
+            _kill_uv_worker()
+        else:
+            try:
+                header = _uv_worker.stdout.read(8)
+                if len(header) == 8:
+                    (size,) = struct.unpack(">Q", header)
+                    output = _uv_worker.stdout.read(size)
+                    if len(output) == size:
+                        return output.decode("utf-8")
+            except OSError:
+                pass
+            # The worker itself died while the script was running.
+            _kill_uv_worker()
+            return ""
+    return _run_python_script_with_uv(script)
+
+
 class PythonTool(Tool):
     def __init__(
         self,
@@ -100,7 +292,7 @@ class PythonTool(Tool):
     def instruction(self) -> str:
         return """
 Use this tool to execute Python code in your chain of thought. The code will not be shown to the user. This tool should be used for internal reasoning, but not for code that is intended to be visible to the user (e.g. when creating plots, tables, or files).
-When you send a message containing python code to python, it will be executed in a stateless docker container, and the stdout of that process will be returned to you. You have to use print statements to access the output.
+When you send a message containing python code to python, it will be executed in a new python process inside a docker container, and the stdout of that process will be returned to you. You have to use print statements to access the output. Python variables do not carry over between calls, but the container is shared: files, installed packages and background processes persist across calls, so do not assume a clean filesystem.
         """.strip()
 
     @property
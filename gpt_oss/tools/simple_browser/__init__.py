@@ -1,8 +1,29 @@
-from .simple_browser_tool import SimpleBrowserTool
-from .backend import ExaBackend, YouComBackend
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .simple_browser_tool import SimpleBrowserTool, close_shared_session
+    from .backend import ExaBackend, YouComBackend
 
 __all__ = [
     "SimpleBrowserTool",
+    "close_shared_session",
     "ExaBackend",
     "YouComBackend",
 ]
+
+_LAZY_IMPORTS = {
+    "SimpleBrowserTool": ".simple_browser_tool",
+    "close_shared_session": ".simple_browser_tool",
+    "ExaBackend": ".backend",
+    "YouComBackend": ".backend",
+}
+
+
+def __getattr__(name: str):
+    # Import submodules on first access to keep `import gpt_oss.tools` cheap.
+    if name in _LAZY_IMPORTS:
+        value = getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
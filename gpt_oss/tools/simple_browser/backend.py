@@ -7,18 +7,16 @@ import asyncio
 import logging
 import os
 from abc import abstractmethod
-from typing import Callable, ParamSpec, TypeVar
-from urllib.parse import quote
+from html import escape
+from typing import AnyStr, Callable, ParamSpec, TypeVar
+from urllib.parse import quote, urlsplit
 
 import chz
-from aiohttp import ClientSession, ClientTimeout
-from tenacity import (
-    after_log,
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
+from aiohttp import (
+    ClientConnectionError,
+    ClientSession,
+    ClientTimeout,
+    ServerTimeoutError,
 )
 
 from .page_contents import (
@@ -29,6 +27,16 @@ from .page_contents import (
     process_html,
 )
 
+try:
+    import orjson
+
+    json_loads = orjson.loads
+
+    def json_dumps(obj: object) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +47,10 @@ class BackendError(Exception):
     pass
 
 
+class BackendRetryableError(BackendError):
+    """Transient backend failure (HTTP 429 or 5xx) that is worth retrying."""
+
+
 P = ParamSpec("P")
 R = TypeVar("R")
 
@@ -49,6 +61,15 @@ def with_retries(
     max_wait_time: float,
 ) -> Callable[P, R]:
     if num_retries > 0:
+        from tenacity import (
+            after_log,
+            before_sleep_log,
+            retry,
+            retry_if_exception_type,
+            stop_after_attempt,
+            wait_exponential,
+        )
+
         retry_decorator = retry(
             stop=stop_after_attempt(num_retries),
             wait=wait_exponential(
@@ -58,20 +79,48 @@ def with_retries(
             ),
             before_sleep=before_sleep_log(logger, logging.INFO),
             after=after_log(logger, logging.INFO),
-            retry=retry_if_exception_type(Exception),
+            retry=retry_if_exception_type(
+                (
+                    ClientConnectionError,
+                    ServerTimeoutError,
+                    asyncio.TimeoutError,
+                    BackendRetryableError,
+                )
+            ),
         )
         return retry_decorator(func)
     else:
         return func
 
 
-def maybe_truncate(text: str, num_chars: int = 1024) -> str:
-    if len(text) > num_chars:
-        text = text[: (num_chars - 3)] + "..."
-    return text
+def _is_retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
 
 
-@chz.chz(typecheck=True)
+def _escape_field(value: object) -> str:
+    """Escape a search result field for the generated HTML; APIs may send null."""
+    return escape(str(value or ""), quote=True)
+
+
+def _normalize_url(url: str) -> str:
+    """Reduce a URL to a key that ignores scheme, `www.` and trailing slashes."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}?{parts.query}"
+
+
+_ELLIPSIS = "..."
+_BYTES_ELLIPSIS = b"..."
+
+
+def maybe_truncate(text: AnyStr, num_chars: int = 1024) -> AnyStr:
+    if len(text) <= num_chars:
+        return text
+    ellipsis = _ELLIPSIS if isinstance(text, str) else _BYTES_ELLIPSIS
+    return text[: (num_chars - 3)] + ellipsis
+
+
+@chz.chz
 class Backend:
     source: str = chz.field(doc="Description of the backend source")
 
@@ -88,26 +137,58 @@ class Backend:
     async def fetch(self, url: str, session: ClientSession) -> PageContents:
         pass
 
+    async def fetch_many(
+        self, urls: list[str], session: ClientSession
+    ) -> list[PageContents | BaseException]:
+        """Fetch several URLs concurrently.
+
+        Results follow the order of `urls`; a URL that could not be fetched
+        gets its exception in place of a page.
+        """
+        return await asyncio.gather(
+            *(self.fetch(url, session) for url in urls), return_exceptions=True
+        )
+
+    def refresh_api_key(self) -> None:
+        """Drop the cached API key so that it is resolved again on next use."""
+        self.__dict__.pop("_api_key", None)
+        self.__dict__.pop("_headers", None)
+
+    @functools.cached_property
+    def _headers(self) -> dict[str, str]:
+        # Shared by every request; aiohttp does not mutate the headers dict.
+        return {"x-api-key": self._get_api_key()}
+
+    @functools.cached_property
+    def _url_cache(self) -> dict[str, str]:
+        return {}
+
+    def _url(self, endpoint: str) -> str:
+        url = self._url_cache.get(endpoint)
+        if url is None:
+            url = self._url_cache[endpoint] = f"{self.BASE_URL}{endpoint}"
+        return url
+
     async def _post(self, session: ClientSession, endpoint: str, payload: dict) -> dict:
-        headers = {"x-api-key": self._get_api_key()}
-        async with session.post(f"{self.BASE_URL}{endpoint}", json=payload, headers=headers) as resp:
+        async with session.post(self._url(endpoint), json=payload, headers=self._headers) as resp:
             if resp.status != 200:
-                raise BackendError(
+                error_cls = BackendRetryableError if _is_retryable_status(resp.status) else BackendError
+                raise error_cls(
                     f"{self.__class__.__name__} error {resp.status}: {await resp.text()}"
                 )
-            return await resp.json()
+            return await resp.json(loads=json_loads)
 
     async def _get(self, session: ClientSession, endpoint: str, params: dict) -> dict:
-        headers = {"x-api-key": self._get_api_key()}
-        async with session.get(f"{self.BASE_URL}{endpoint}", params=params, headers=headers) as resp:
+        async with session.get(self._url(endpoint), params=params, headers=self._headers) as resp:
             if resp.status != 200:
-                raise BackendError(
+                error_cls = BackendRetryableError if _is_retryable_status(resp.status) else BackendError
+                raise error_cls(
                     f"{self.__class__.__name__} error {resp.status}: {await resp.text()}"
                 )
-            return await resp.json()
+            return await resp.json(loads=json_loads)
 
 
-@chz.chz(typecheck=True)
+@chz.chz
 class ExaBackend(Backend):
     """Backend that uses the Exa Search API."""
 
@@ -119,12 +200,16 @@ class ExaBackend(Backend):
 
     BASE_URL: str = "https://api.exa.ai"
 
-    def _get_api_key(self) -> str:
+    @functools.cached_property
+    def _api_key(self) -> str:
         key = self.api_key or os.environ.get("EXA_API_KEY")
         if not key:
             raise BackendError("Exa API key not provided")
         return key
 
+    def _get_api_key(self) -> str:
+        return self._api_key
+
 
     async def search(
         self, query: str, topn: int, session: ClientSession
@@ -143,7 +228,7 @@ class ExaBackend(Backend):
 <html><body>
 <h1>Search Results</h1>
 <ul>
-{"".join([f"<li><a href='{url}'>{title}</a> {summary}</li>" for title, url, summary in titles_and_urls])}
+{"".join(f"<li><a href='{_escape_field(url)}'>{_escape_field(title or url)}</a> {_escape_field(summary)}</li>" for title, url, summary in titles_and_urls)}
 </ul>
 </body></html>
 """
@@ -165,18 +250,73 @@ class ExaBackend(Backend):
             "/contents",
             {"urls": [url], "text": { "includeHtmlTags": True }},
         )
-        results = data.get("results", [])
+        results = data.get("results")
         if not results:
             raise BackendError(f"No contents returned for {url}")
+        first = results[0]
         return process_html(
-            html=results[0].get("text", ""),
+            html=first.get("text", ""),
             url=url,
-            title=results[0].get("title", ""),
+            title=first.get("title", ""),
             display_urls=True,
             session=session,
         )
 
-@chz.chz(typecheck=True)
+    async def fetch_many(
+        self, urls: list[str], session: ClientSession
+    ) -> list[PageContents | BaseException]:
+        # The contents endpoint accepts several URLs, so fetch them all in one request.
+        stripped_urls = [
+            url[len(VIEW_SOURCE_PREFIX) :] if url.startswith(VIEW_SOURCE_PREFIX) else url
+            for url in urls
+        ]
+        try:
+            data = await self._post(
+                session,
+                "/contents",
+                {"urls": stripped_urls, "text": { "includeHtmlTags": True }},
+            )
+        except Exception as e:
+            return [e] * len(urls)
+        results = data.get("results") or []
+        results_by_url = {}
+        for result in results:
+            for key in ("url", "id"):
+                if result.get(key):
+                    results_by_url.setdefault(result[key], result)
+                    results_by_url.setdefault(_normalize_url(result[key]), result)
+        matched = [
+            results_by_url.get(url) or results_by_url.get(_normalize_url(url))
+            for url in stripped_urls
+        ]
+        if len(results) == len(stripped_urls):
+            # Exa may report a URL after following redirects; results come back
+            # in request order, so take the positional one if it is unclaimed.
+            claimed = {id(result) for result in matched if result is not None}
+            matched = [
+                results[i] if result is None and id(results[i]) not in claimed else result
+                for i, result in enumerate(matched)
+            ]
+        pages: list[PageContents | BaseException] = []
+        for url, result in zip(stripped_urls, matched):
+            if result is None:
+                pages.append(BackendError(f"No contents returned for {url}"))
+                continue
+            try:
+                pages.append(
+                    process_html(
+                        html=result.get("text", ""),
+                        url=url,
+                        title=result.get("title", ""),
+                        display_urls=True,
+                        session=session,
+                    )
+                )
+            except Exception as e:
+                pages.append(e)
+        return pages
+
+@chz.chz
 class YouComBackend(Backend):
     """Backend that uses the You.com Search API."""
 
@@ -184,12 +324,16 @@ class YouComBackend(Backend):
 
     BASE_URL: str = "https://api.ydc-index.io"
 
-    def _get_api_key(self) -> str:
+    @functools.cached_property
+    def _api_key(self) -> str:
         key = os.environ.get("YDC_API_KEY")
         if not key:
             raise BackendError("You.com API key not provided")
         return key
 
+    def _get_api_key(self) -> str:
+        return self._api_key
+
     
     async def search(
         self, query: str, topn: int, session: ClientSession
@@ -216,7 +360,7 @@ class YouComBackend(Backend):
 <html><body>
 <h1>Search Results</h1>
 <ul>
-{"".join([f"<li><a href='{url}'>{title}</a> {summary}</li>" for title, url, summary in titles_and_urls])}
+{"".join(f"<li><a href='{_escape_field(url)}'>{_escape_field(title or url)}</a> {_escape_field(summary)}</li>" for title, url, summary in titles_and_urls)}
 </ul>
 </body></html>
 """
@@ -240,12 +384,13 @@ class YouComBackend(Backend):
         )
         if not data:
             raise BackendError(f"No contents returned for {url}")
-        if "html" not in data[0]:
+        first = data[0]
+        if "html" not in first:
             raise BackendError(f"No HTML returned for {url}")
         return process_html(
-            html=data[0].get("html", ""),
+            html=first["html"],
             url=url,
-            title=data[0].get("title", ""),
+            title=first.get("title", ""),
             display_urls=True,
             session=session,
         )
@@ -1,17 +1,19 @@
+import asyncio
 import contextvars
 import dataclasses
 import functools
 import itertools
 import json
 import re
+import ssl
 import textwrap
-from typing import Any, AsyncIterator, Callable, ParamSpec, Sequence
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, ParamSpec, Sequence
 from urllib.parse import quote, unquote
 
 import pydantic
 import structlog
 import tiktoken
-from aiohttp import ClientSession
+from aiohttp import ClientSession, TCPConnector
 from openai_harmony import (
     Author,
     Content,
@@ -28,6 +30,7 @@ from .backend import (
     VIEW_SOURCE_PREFIX,
     Backend,
     BackendError,
+    json_dumps,
     maybe_truncate,
 )
 from .page_contents import Extract, PageContents
@@ -57,6 +60,74 @@ class ToolUsageError(Exception):
     pass
 
 
+_ssl_context: ssl.SSLContext | None = None
+_shared_sessions: dict[
+    asyncio.AbstractEventLoop, tuple[ClientSession, AsyncGenerator[None, None]]
+] = {}
+
+
+async def _close_on_loop_shutdown(
+    loop: asyncio.AbstractEventLoop, session: ClientSession
+) -> AsyncGenerator[None, None]:
+    """
+    Close `session` once the generator is finalized.
+
+    Event loops finalize their open async generators in `shutdown_asyncgens()`,
+    which `asyncio.run()` and `asyncio.Runner.close()` await before closing the
+    loop, so this runs while the session can still be closed cleanly.
+    """
+    try:
+        yield
+    finally:
+        if _shared_sessions.get(loop, (None,))[0] is session:
+            del _shared_sessions[loop]
+        await session.close()
+
+
+async def _get_shared_session() -> ClientSession:
+    """
+    Return a ClientSession shared by all browser tools on the running event loop.
+
+    Reusing the session keeps pooled keep-alive connections (and TLS sessions)
+    to the search backends open across requests. Each event loop gets its own
+    session, which is closed when the loop shuts down its async generators, or
+    earlier by `close_shared_session()`.
+    """
+    global _ssl_context
+    loop = asyncio.get_running_loop()
+    session, _ = _shared_sessions.get(loop, (None, None))
+    if session is not None and not session.closed:
+        return session
+    # Loops closed without `shutdown_asyncgens()` never finalized their entry.
+    for stale_loop in [l for l in _shared_sessions if l.is_closed()]:
+        del _shared_sessions[stale_loop]
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    connector = TCPConnector(
+        limit=100,
+        limit_per_host=32,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+        force_close=False,
+        ssl=_ssl_context,
+    )
+    session = ClientSession(connector=connector, json_serialize=json_dumps)
+    closer = _close_on_loop_shutdown(loop, session)
+    _shared_sessions[loop] = (session, closer)
+    # Start the generator so the loop tracks it for shutdown_asyncgens().
+    await anext(closer)
+    return session
+
+
+async def close_shared_session() -> None:
+    """
+    Close the running loop's session returned by `_get_shared_session`, if any.
+    """
+    entry = _shared_sessions.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
 def function_the_model_can_call(
     fn: Callable[_P, AsyncIterator[Message]],
 ) -> Callable[_P, AsyncIterator[Message]]:
@@ -435,8 +506,7 @@ sources=""" + self.backend.source
             return page
 
         try:
-            async with ClientSession() as session:
-                page = await backend.fetch(url, session=session)
+            page = await backend.fetch(url, session=await _get_shared_session())
             return page
         except Exception as e:
             msg = maybe_truncate(str(e))
@@ -463,12 +533,11 @@ sources=""" + self.backend.source
         del topn
         del top_n
         try:
-            async with ClientSession() as session:
-                search_page = await self.backend.search(
-                    query=query,
-                    topn=self.max_search_results,
-                    session=session,
-                )
+            search_page = await self.backend.search(
+                query=query,
+                topn=self.max_search_results,
+                session=await _get_shared_session(),
+            )
         except Exception as e:
             msg = maybe_truncate(str(e))
             raise BackendError(f"Error during search for `{query}`: {msg}") from e
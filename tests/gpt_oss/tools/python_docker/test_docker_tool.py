@@ -0,0 +1,86 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from gpt_oss.tools.python_docker import docker_tool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="uv worker requires os.fork")
+
+
+@pytest.fixture
+def fake_uv(tmp_path, monkeypatch):
+    """Put a `uv` on PATH that runs `uv run --no-project python ...` with this interpreter."""
+    uv_path = tmp_path / "uv"
+    uv_path.write_text(f'#!/bin/sh\nshift 3\nexec "{sys.executable}" "$@"\n')
+    uv_path.chmod(uv_path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    yield
+    with docker_tool._uv_worker_lock:
+        docker_tool._kill_uv_worker()
+
+
+SCRIPTS = {
+    "print": "print('hello')",
+    "exception": "print('before'); raise ValueError('boom')",
+    "sys_exit": "import sys; print('bye'); sys.exit(3)",
+    "os_system": "import os; os.system('echo hi')",
+    "stdout_buffer": "import sys; sys.stdout.buffer.write(b'raw\\n')",
+    "dunder_file": "import os; print(os.path.basename(__file__), __name__)",
+    "thread": textwrap.dedent("""
+        import threading, time
+        def late():
+            time.sleep(0.1)
+            print('late')
+        threading.Thread(target=late).start()
+    """),
+    "atexit": "import atexit; atexit.register(print, 'at exit')",
+    "multiprocessing": textwrap.dedent("""
+        from multiprocessing import Pool
+        def square(x):
+            return x * x
+        if __name__ == '__main__':
+            with Pool(2) as pool:
+                print(pool.map(square, [1, 2, 3]))
+    """),
+}
+
+
+@pytest.mark.parametrize("script", SCRIPTS.values(), ids=SCRIPTS.keys())
+def test_uv_worker_matches_subprocess(fake_uv, script):
+    expected = docker_tool._run_python_script_with_uv(script)
+    assert docker_tool.call_python_script_with_uv(script) == expected
+    # The same worker serves the next script.
+    assert docker_tool.call_python_script_with_uv(script) == expected
+
+
+def test_uv_worker_isolates_scripts(fake_uv):
+    docker_tool.call_python_script_with_uv(textwrap.dedent("""
+        import os, sys
+        sys.modules['json'] = None
+        os.chdir('/')
+        os.environ['GPT_OSS_TEST_LEAK'] = '1'
+    """))
+    output = docker_tool.call_python_script_with_uv(textwrap.dedent("""
+        import json, os
+        print(os.getcwd() != '/', os.environ.get('GPT_OSS_TEST_LEAK'), json.dumps(1))
+    """))
+    assert output == "True None 1\n"
+
+
+def test_uv_worker_does_not_rerun_scripts(fake_uv, tmp_path):
+    marker = tmp_path / "runs"
+    # Kills the worker itself while the script is running.
+    script = textwrap.dedent(f"""
+        import os, signal, time
+        with open({str(marker)!r}, 'a') as f:
+            f.write('x')
+        os.kill(os.getppid(), signal.SIGKILL)
+        time.sleep(0.5)
+    """)
+    assert docker_tool.call_python_script_with_uv(script) == ""
+    assert marker.read_text() == "x"
+    # A new worker is started for the next script.
+    assert docker_tool.call_python_script_with_uv("print('after')") == "after\n"
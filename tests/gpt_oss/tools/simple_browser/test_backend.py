@@ -3,7 +3,7 @@ from typing import Generator, Any
 from unittest import mock
 from aiohttp import ClientSession
 
-from gpt_oss.tools.simple_browser.backend import YouComBackend
+from gpt_oss.tools.simple_browser.backend import BackendError, BackendRetryableError, ExaBackend, YouComBackend
 
 class MockAiohttpResponse:
     """Mocks responses for get/post requests from async libraries."""
@@ -12,9 +12,12 @@ class MockAiohttpResponse:
         self._json = json
         self.status = status
 
-    async def json(self):
+    async def json(self, **kwargs):
         return self._json
 
+    async def text(self):
+        return str(self._json)
+
     async def __aexit__(self, exc_type, exc, tb):
         pass
 
@@ -52,6 +55,27 @@ async def test_youcom_backend_search(mock_session_get):
         assert result.title == "test"
         assert result.urls == {"0": "https://www.example.com/web1", "1": "https://www.example.com/web2", "2": "https://www.example.com/news1", "3": "https://www.example.com/news2"}
 
+@pytest.mark.asyncio
+@mock.patch("aiohttp.ClientSession.get")
+async def test_youcom_backend_search_escapes_fields(mock_session_get):
+    backend = YouComBackend(source="web")
+    api_response = {
+        "results": {
+            "web": [
+                {"title": "<b>Tom & Jerry's</b>", "url": "https://www.example.com/?a=1&b='2'", "snippets": "1 < 2 & 'quoted'"},
+                {"title": None, "url": "https://www.example.com/untitled", "snippets": None},
+            ],
+        }
+    }
+    with mock.patch("os.environ.get", wraps=mock_os_environ_get):
+        mock_session_get.return_value = MockAiohttpResponse(api_response, 200)
+        async with ClientSession() as session:
+            result = await backend.search(query="test", topn=10, session=session)
+    assert result.urls == {"0": "https://www.example.com/?a=1&b='2'", "1": "https://www.example.com/untitled"}
+    assert "<b>Tom & Jerry's</b>" in result.text
+    assert "1 < 2 & 'quoted'" in result.text
+    assert "None" not in result.text
+
 @pytest.mark.asyncio
 @mock.patch("aiohttp.ClientSession.post")
 async def test_youcom_backend_fetch(mock_session_get):
@@ -67,4 +91,90 @@ async def test_youcom_backend_fetch(mock_session_get):
         assert result.text == "\nURL: https://www.example.com/fetch1\nFetch Result 1 text"
 
 
-    
\ No newline at end of file
+    
+
+@pytest.mark.asyncio
+@mock.patch("aiohttp.ClientSession.post")
+async def test_youcom_backend_fetch_many(mock_session_post):
+    backend = YouComBackend(source="web")
+    api_response = [
+        {"title": "Fetch Result 1", "url": "https://www.example.com/fetch1", "html": "<div>Fetch Result 1 text</div>"},
+    ]
+    with mock.patch("os.environ.get", wraps=mock_os_environ_get):
+        mock_session_post.side_effect = [
+            MockAiohttpResponse(api_response, 200),
+            MockAiohttpResponse([], 200),
+        ]
+        async with ClientSession() as session:
+            results = await backend.fetch_many(
+                urls=["https://www.example.com/fetch1", "https://www.example.com/missing"],
+                session=session,
+            )
+        assert len(results) == 2
+        assert results[0].title == "Fetch Result 1"
+        assert isinstance(results[1], BackendError)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, retryable", [(503, True), (429, True), (404, False)])
+@mock.patch("aiohttp.ClientSession.post")
+async def test_youcom_backend_fetch_error_status(mock_session_post, status, retryable):
+    backend = YouComBackend(source="web")
+    with mock.patch("os.environ.get", wraps=mock_os_environ_get):
+        mock_session_post.return_value = MockAiohttpResponse({"error": "failed"}, status)
+        async with ClientSession() as session:
+            with pytest.raises(BackendError) as exc_info:
+                await backend.fetch(url="https://www.example.com/fetch1", session=session)
+        assert isinstance(exc_info.value, BackendRetryableError) == retryable
+
+@pytest.mark.asyncio
+@mock.patch("aiohttp.ClientSession.post")
+async def test_exa_backend_fetch_many(mock_session_post):
+    backend = ExaBackend(source="web", api_key="test_api_key")
+    api_response = {
+        "results": [
+            # Normalized by Exa: scheme and trailing slash differ from the request.
+            {"id": "https://example.com/a/", "url": "https://example.com/a/", "title": "A", "text": "<div>A text</div>"},
+            # Redirected: only matched by position.
+            {"id": "https://example.org/moved", "url": "https://example.org/moved", "title": "B", "text": "<div>B text</div>"},
+        ]
+    }
+    mock_session_post.return_value = MockAiohttpResponse(api_response, 200)
+    async with ClientSession() as session:
+        results = await backend.fetch_many(
+            urls=["http://www.example.com/a", "https://example.com/b"],
+            session=session,
+        )
+    assert mock_session_post.call_count == 1
+    assert [result.title for result in results] == ["A", "B"]
+    assert results[1].url == "https://example.com/b"
+
+@pytest.mark.asyncio
+@mock.patch("aiohttp.ClientSession.post")
+async def test_exa_backend_fetch_many_missing(mock_session_post):
+    backend = ExaBackend(source="web", api_key="test_api_key")
+    api_response = {
+        "results": [
+            {"id": "https://example.com/b", "url": "https://example.com/b", "title": "B", "text": "<div>B text</div>"},
+        ]
+    }
+    mock_session_post.return_value = MockAiohttpResponse(api_response, 200)
+    async with ClientSession() as session:
+        results = await backend.fetch_many(
+            urls=["https://example.com/a", "https://example.com/b"],
+            session=session,
+        )
+    assert isinstance(results[0], BackendError)
+    assert results[1].title == "B"
+
+@pytest.mark.asyncio
+@mock.patch("aiohttp.ClientSession.post")
+async def test_exa_backend_fetch_many_error_status(mock_session_post):
+    backend = ExaBackend(source="web", api_key="test_api_key")
+    mock_session_post.return_value = MockAiohttpResponse({"error": "failed"}, 503)
+    async with ClientSession() as session:
+        results = await backend.fetch_many(
+            urls=["https://example.com/a", "https://example.com/b"],
+            session=session,
+        )
+    assert len(results) == 2
+    assert all(isinstance(result, BackendRetryableError) for result in results)
@@ -0,0 +1,38 @@
+import asyncio
+import gc
+import warnings
+
+from gpt_oss.tools.simple_browser import simple_browser_tool
+from gpt_oss.tools.simple_browser.simple_browser_tool import (
+    _get_shared_session,
+    close_shared_session,
+)
+
+
+async def _get_twice():
+    session = await _get_shared_session()
+    assert await _get_shared_session() is session
+    return session
+
+
+def test_shared_session_closed_with_each_loop():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        first = asyncio.run(_get_twice())
+        second = asyncio.run(_get_twice())
+        gc.collect()
+    assert first is not second
+    assert first.closed and second.closed
+    assert not simple_browser_tool._shared_sessions
+
+
+def test_close_shared_session():
+    async def main():
+        session = await _get_shared_session()
+        await close_shared_session()
+        assert session.closed
+        assert await _get_shared_session() is not session
+        await close_shared_session()
+
+    asyncio.run(main())
+    assert not simple_browser_tool._shared_sessions